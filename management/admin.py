@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import reverse
 from django.utils.html import format_html
-from django.db.models import F, Sum
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from collections import defaultdict
+from decimal import Decimal
 
 from .models import (
     Customer, FinishedProduct, RawMaterial,
@@ -12,6 +15,11 @@ from .models import (
 class BillItemInline(admin.TabularInline):
     model = BillItem
     extra = 1
+    # Autocomplete avoids loading every product into each row's dropdown
+    autocomplete_fields = ('product',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
 
 # Admin class for Bill with a print bill link and robust stock management
 @admin.register(Bill)
@@ -24,9 +32,21 @@ class BillAdmin(admin.ModelAdmin):
     list_display_links = ('id', 'customer')
     list_filter = ('bill_date', 'is_paid')
     search_fields = ('customer__name', 'id')
+    list_select_related = ('customer',)
     inlines = [BillItemInline]
     actions = ['mark_as_paid']
 
+    # Fetch the customer and the bill subtotal in the same query to avoid
+    # per-row lookups. The subtotal is stored where Bill.get_subtotal caches it.
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('customer').annotate(
+            _subtotal_cache=Coalesce(
+                Sum('items__total_price'),
+                Decimal('0.00'),
+                output_field=DecimalField(),
+            )
+        )
+
     # Method to create the HTML for the print button
     def print_bill_link(self, obj):
         url = reverse('bill_print', args=[obj.id])
@@ -53,22 +73,38 @@ class BillAdmin(admin.ModelAdmin):
     
     def save_related(self, request, form, formsets, change):
         super().save_related(request, form, formsets, change)
-        
-        # We need to handle both new items and changes to existing ones.
+        # Items were just saved, so any subtotal cached on the bill is stale
+        form.instance.clear_subtotal_cache()
+
+        # Net stock change per product, so each product is updated only once.
+        # The admin change form already wraps save_model and save_related in
+        # transaction.atomic, so the item saves and this UPDATE commit together.
+        stock_deltas = defaultdict(Decimal)
         for formset in formsets:
-            # Handle stock deduction for added or changed items
-            for form in formset.save_existing_objects():
-                item = form.instance
-                # Deduct finished product stock
-                item.product.current_stock_kg = F('current_stock_kg') - item.quantity_kg
-                item.product.save()
-
-            # Handle stock increase for deleted items
-            for form in formset.deleted_forms:
-                item = form.instance
-                # Re-add finished product stock
-                item.product.current_stock_kg = F('current_stock_kg') + item.quantity_kg
-                item.product.save()
+            if formset.model is not BillItem:
+                continue
+
+            # Deduct finished product stock for added items
+            for item in formset.new_objects:
+                stock_deltas[item.product_id] -= item.quantity_kg
+
+            for item_form in formset.initial_forms:
+                if item_form in formset.deleted_forms:
+                    # Re-add finished product stock for deleted items
+                    stock_deltas[item_form.initial['product']] += item_form.initial['quantity_kg']
+                elif item_form.has_changed():
+                    # Return the previous quantity and deduct the new one
+                    stock_deltas[item_form.initial['product']] += item_form.initial['quantity_kg']
+                    stock_deltas[item_form.instance.product_id] -= item_form.instance.quantity_kg
+
+        stock_deltas = {pk: delta for pk, delta in stock_deltas.items() if delta}
+        if stock_deltas:
+            FinishedProduct.objects.filter(pk__in=stock_deltas).update(
+                current_stock_kg=F('current_stock_kg') + Case(
+                    *[When(pk=pk, then=Value(delta)) for pk, delta in stock_deltas.items()],
+                    output_field=DecimalField(),
+                )
+            )
 
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
@@ -79,6 +115,7 @@ class CustomerAdmin(admin.ModelAdmin):
 class FinishedProductAdmin(admin.ModelAdmin):
     list_display = ('name', 'current_stock_kg', 'cost_per_kg', 'mrp_per_kg', 'selling_price_per_kg')
     readonly_fields = ('current_stock_kg',)
+    search_fields = ('name',)
 
 @admin.register(RawMaterial)
 class RawMaterialAdmin(admin.ModelAdmin):
@@ -103,9 +140,9 @@ class WheatPurchaseAdmin(admin.ModelAdmin):
         # Update stock on both creation and changes
         if not change:
             # Handle new purchase
-            raw_material = obj.raw_material
-            raw_material.current_stock_kg = F('current_stock_kg') + obj.quantity_kg
-            raw_material.save()
+            RawMaterial.objects.filter(pk=obj.raw_material_id).update(
+                current_stock_kg=F('current_stock_kg') + obj.quantity_kg
+            )
         else:
             # Logic for handling changes would go here if needed
             pass
@@ -121,14 +158,20 @@ class ProductionAdmin(admin.ModelAdmin):
         
         # Update stock on both creation and changes
         if not change:
-            raw_material = obj.raw_material
-            finished_product = obj.finished_product
-            
-            raw_material.current_stock_kg = F('current_stock_kg') - (obj.quantity_kg * obj.finished_product.raw_material_ratio)
-            raw_material.save()
-
-            finished_product.current_stock_kg = F('current_stock_kg') + obj.quantity_kg
-            finished_product.save()
+            # Read the ratio inside the UPDATE rather than loading the product
+            raw_material_ratio = Subquery(
+                FinishedProduct.objects.filter(pk=obj.finished_product_id).values('raw_material_ratio')[:1]
+            )
+            RawMaterial.objects.filter(pk=obj.raw_material_id).update(
+                current_stock_kg=F('current_stock_kg') - ExpressionWrapper(
+                    Value(obj.quantity_kg) * raw_material_ratio, output_field=DecimalField()
+                )
+            )
+            # Commits with the raw material update above in the admin's
+            # transaction, so the two stock changes cannot be split
+            FinishedProduct.objects.filter(pk=obj.finished_product_id).update(
+                current_stock_kg=F('current_stock_kg') + obj.quantity_kg
+            )
         else:
             # Logic for handling changes would go here if needed
             pass
\ No newline at end of file
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-14 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0006_alter_billitem_product_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['bill_date'], name='management__bill_da_372a2b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['is_paid'], name='management__is_paid_550d51_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['date'], name='management__date_09301a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='production',
+            index=models.Index(fields=['production_date'], name='management__product_74f0fd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wheatpurchase',
+            index=models.Index(fields=['purchase_date'], name='management__purchas_406a43_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-14 17:50
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0007_add_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='billitem',
+            name='total_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('quantity_kg'), '*', models.F('price_per_unit')), output_field=models.DecimalField(decimal_places=4, max_digits=20), verbose_name='Total Price'),
+        ),
+    ]
@@ -1,21 +1,36 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.cache import cache
 from django.db import models
 from django.db.models import F, Sum
+from django.db.models.functions import Upper
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from decimal import Decimal
 
+# Seconds a cached first pk is trusted. Deletes in this process clear it at
+# once; other processes using a per-process cache pick it up within this window.
+FIRST_PK_CACHE_TIMEOUT = 60
+
+def _first_pk_cache_key(model):
+    return f"management:first_pk:{model._meta.label_lower}"
+
+# Cached because the helpers below run as field defaults on every form render
+def _get_first_pk(model):
+    key = _first_pk_cache_key(model)
+    pk = cache.get(key)
+    if pk is None:
+        pk = model.objects.values_list('pk', flat=True).first()
+        cache.set(key, pk, FIRST_PK_CACHE_TIMEOUT)
+    return pk
+
 # Helper function to get the first RawMaterial ID
 def get_first_raw_material_pk():
-    try:
-        return RawMaterial.objects.first().pk
-    except RawMaterial.DoesNotExist:
-        return None
+    return _get_first_pk(RawMaterial)
 
 # Helper function to get the first FinishedProduct ID
 def get_first_finished_product_pk():
-    try:
-        return FinishedProduct.objects.first().pk
-    except FinishedProduct.DoesNotExist:
-        return None
+    return _get_first_pk(FinishedProduct)
 
 class RawMaterial(models.Model):
     name = models.CharField(max_length=100, unique=True, verbose_name="Raw Material Name")
@@ -58,6 +73,9 @@ class WheatPurchase(models.Model):
         verbose_name = "Wheat Purchase"
         verbose_name_plural = "Wheat Purchases"
         ordering = ['-purchase_date']
+        indexes = [
+            models.Index(fields=['purchase_date']),
+        ]
 
 class FinishedProduct(models.Model):
     name = models.CharField(max_length=100, unique=True, verbose_name="Product Name")
@@ -101,6 +119,9 @@ class Production(models.Model):
         verbose_name = "Production Entry"
         verbose_name_plural = "Production Entries"
         ordering = ['-production_date']
+        indexes = [
+            models.Index(fields=['production_date']),
+        ]
 
 class Customer(models.Model):
     name = models.CharField(max_length=200, verbose_name="Customer Name")
@@ -114,6 +135,13 @@ class Customer(models.Model):
     class Meta:
         verbose_name = "Customer"
         verbose_name_plural = "Customers"
+        indexes = [
+            # Trigram index for the admin's case-insensitive name search
+            GinIndex(
+                OpClass(Upper('name'), name='gin_trgm_ops'),
+                name='customer_name_trgm_idx',
+            ),
+        ]
 
 class Bill(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, verbose_name="Customer")
@@ -123,11 +151,24 @@ class Bill(models.Model):
     has_gst = models.BooleanField(default=True, verbose_name="Include GST")
 
     def get_subtotal(self):
-        subtotal = self.items.aggregate(total=Sum(F('quantity_kg') * F('price_per_unit'))).get('total')
+        # Cached so GST and grand total do not repeat the aggregate query
+        if hasattr(self, '_subtotal_cache'):
+            return self._subtotal_cache
+        if 'items' in getattr(self, '_prefetched_objects_cache', {}):
+            # Items were prefetched, so add them up without another query
+            subtotal = sum((item.total_price for item in self.items.all()), Decimal('0.00'))
+        else:
+            subtotal = self.items.aggregate(total=Sum('total_price')).get('total')
         if subtotal is None:
-            return Decimal('0.00')
+            subtotal = Decimal('0.00')
+        self._subtotal_cache = subtotal
         return subtotal
 
+    def clear_subtotal_cache(self):
+        # Call after the bill's items change so the next total is recomputed
+        if hasattr(self, '_subtotal_cache'):
+            del self._subtotal_cache
+
     def get_gst_amount(self):
         if self.has_gst:
             return self.get_subtotal() * Decimal('0.18')
@@ -143,6 +184,10 @@ class Bill(models.Model):
         verbose_name = "Sales Bill"
         verbose_name_plural = "Sales Bills"
         ordering = ['-bill_date']
+        indexes = [
+            models.Index(fields=['bill_date']),
+            models.Index(fields=['is_paid']),
+        ]
 
 class BillItem(models.Model):
     bill = models.ForeignKey(Bill, on_delete=models.CASCADE, related_name='items', verbose_name="Sales Bill")
@@ -152,11 +197,14 @@ class BillItem(models.Model):
     quantity_kg = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Quantity (Kg)")
     price_per_unit = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Price Per Unit")
     has_stock_deducted = models.BooleanField(default=False)
+    # Stored by the database so totals can be summed without per-row arithmetic
+    total_price = models.GeneratedField(
+        expression=F('quantity_kg') * F('price_per_unit'),
+        output_field=models.DecimalField(max_digits=20, decimal_places=4),
+        db_persist=True,
+        verbose_name="Total Price",
+    )
 
-    @property
-    def total_price(self):
-        return self.quantity_kg * self.price_per_unit
-        
     def __str__(self):
         return f"{self.quantity_kg} kg of {self.product.name}"
 
@@ -175,4 +223,13 @@ class Expense(models.Model):
     class Meta:
         verbose_name = "Other Expense"
         verbose_name_plural = "Other Expenses"
-        ordering = ['-date']
\ No newline at end of file
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+# Reset the cached default when raw materials or products are added or removed
+@receiver([post_save, post_delete], sender=RawMaterial)
+@receiver([post_save, post_delete], sender=FinishedProduct)
+def clear_first_pk_cache(sender, **kwargs):
+    cache.delete(_first_pk_cache_key(sender))
@@ -1,3 +1,165 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Sum
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Bill, BillItem, Customer, FinishedProduct, RawMaterial, get_first_finished_product_pk
+from .views import INVENTORY_PAGE_SIZE, _bill_grand_total_expression
+
+
+class BillGrandTotalExpressionTests(TestCase):
+    def setUp(self):
+        # The cached first pk survives test rollbacks, so start each test clean
+        cache.clear()
+        customer = Customer.objects.create(name="Test Customer", phone_number="9000000000")
+        product = FinishedProduct.objects.create(name="Atta")
+
+        self.gst_bill = Bill.objects.create(customer=customer, has_gst=True, other_expenses=Decimal('5.00'))
+        BillItem.objects.create(bill=self.gst_bill, product=product, quantity_kg=Decimal('2.50'), price_per_unit=Decimal('40.00'))
+        BillItem.objects.create(bill=self.gst_bill, product=product, quantity_kg=Decimal('1.00'), price_per_unit=Decimal('12.35'))
+
+        self.plain_bill = Bill.objects.create(customer=customer, has_gst=False, other_expenses=Decimal('2.00'))
+        BillItem.objects.create(bill=self.plain_bill, product=product, quantity_kg=Decimal('3.00'), price_per_unit=Decimal('10.00'))
+
+        self.empty_bill = Bill.objects.create(customer=customer, has_gst=True, other_expenses=Decimal('7.50'))
+
+    def test_matches_get_grand_total_per_bill(self):
+        bills = Bill.objects.annotate(grand_total=_bill_grand_total_expression())
+        for bill in bills:
+            self.assertEqual(bill.grand_total, Bill.objects.get(pk=bill.pk).get_grand_total())
+
+    def test_expected_values(self):
+        bills = Bill.objects.annotate(grand_total=_bill_grand_total_expression()).in_bulk()
+        # (100.00 + 12.35) * 1.18 + 5.00
+        self.assertEqual(bills[self.gst_bill.pk].grand_total, Decimal('137.573'))
+        self.assertEqual(bills[self.plain_bill.pk].grand_total, Decimal('32.00'))
+        self.assertEqual(bills[self.empty_bill.pk].grand_total, Decimal('7.50'))
+
+    def test_line_totals_are_not_rounded(self):
+        bill = Bill.objects.create(has_gst=False)
+        item = BillItem.objects.create(
+            bill=bill, product=FinishedProduct.objects.get(), quantity_kg=Decimal('0.25'), price_per_unit=Decimal('0.33')
+        )
+        item.refresh_from_db()
+        self.assertEqual(item.total_price, Decimal('0.0825'))
+        self.assertEqual(Bill.objects.get(pk=bill.pk).get_subtotal(), Decimal('0.0825'))
+
+    def test_sum_across_bills(self):
+        total = Bill.objects.aggregate(total=Sum(_bill_grand_total_expression()))['total']
+        self.assertEqual(total, Decimal('177.073'))
+
+
+class BillAdminStockTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        self.customer = Customer.objects.create(name="Test Customer", phone_number="9000000000")
+        self.atta = FinishedProduct.objects.create(name="Atta", current_stock_kg=Decimal('50.00'))
+        self.suji = FinishedProduct.objects.create(name="Suji", current_stock_kg=Decimal('50.00'))
+
+    def post_bill(self, url, items, initial_forms=0):
+        data = {
+            'customer': self.customer.pk,
+            'other_expenses': '0',
+            'has_gst': 'on',
+            'items-TOTAL_FORMS': str(len(items)),
+            'items-INITIAL_FORMS': str(initial_forms),
+            'items-MIN_NUM_FORMS': '0',
+            'items-MAX_NUM_FORMS': '1000',
+        }
+        for index, item in enumerate(items):
+            for key, value in item.items():
+                data[f'items-{index}-{key}'] = value
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+
+    def create_bill(self):
+        self.post_bill('/admin/management/bill/add/', [
+            {'product': self.atta.pk, 'quantity_kg': '3', 'price_per_unit': '10'},
+            {'product': self.suji.pk, 'quantity_kg': '2', 'price_per_unit': '10'},
+        ])
+        bill = Bill.objects.get()
+        return bill, list(bill.items.order_by('pk'))
+
+    def assertStock(self, atta, suji):
+        self.atta.refresh_from_db()
+        self.suji.refresh_from_db()
+        self.assertEqual(self.atta.current_stock_kg, Decimal(atta))
+        self.assertEqual(self.suji.current_stock_kg, Decimal(suji))
+
+    def item_data(self, bill, item, **overrides):
+        data = {
+            'id': item.pk,
+            'bill': bill.pk,
+            'product': item.product_id,
+            'quantity_kg': str(item.quantity_kg),
+            'price_per_unit': str(item.price_per_unit),
+        }
+        data.update(overrides)
+        return data
+
+    def test_adding_items_deducts_stock(self):
+        self.create_bill()
+        self.assertStock('47.00', '48.00')
+
+    def test_changing_quantity_deducts_only_the_difference(self):
+        bill, (atta_item, suji_item) = self.create_bill()
+        self.post_bill(f'/admin/management/bill/{bill.pk}/change/', [
+            self.item_data(bill, atta_item, quantity_kg='5'),
+            self.item_data(bill, suji_item),
+        ], initial_forms=2)
+        self.assertStock('45.00', '48.00')
+
+    def test_changing_product_moves_stock(self):
+        bill, (atta_item, suji_item) = self.create_bill()
+        self.post_bill(f'/admin/management/bill/{bill.pk}/change/', [
+            self.item_data(bill, atta_item, product=self.suji.pk),
+            self.item_data(bill, suji_item),
+        ], initial_forms=2)
+        self.assertStock('50.00', '45.00')
+
+    def test_deleting_item_restores_stock(self):
+        bill, (atta_item, suji_item) = self.create_bill()
+        self.post_bill(f'/admin/management/bill/{bill.pk}/change/', [
+            self.item_data(bill, atta_item),
+            self.item_data(bill, suji_item, DELETE='on'),
+        ], initial_forms=2)
+        self.assertStock('47.00', '50.00')
+        self.assertEqual(list(bill.items.all()), [atta_item])
+
+
+class FirstPkDefaultTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_pk_is_cleared_when_product_is_deleted(self):
+        first = FinishedProduct.objects.create(name="Atta")
+        second = FinishedProduct.objects.create(name="Suji")
+        self.assertEqual(get_first_finished_product_pk(), first.pk)
+        first.delete()
+        self.assertEqual(get_first_finished_product_pk(), second.pk)
+
+
+
+class InventorySummaryPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        RawMaterial.objects.bulk_create(
+            RawMaterial(name=f"Material {index:03}") for index in range(INVENTORY_PAGE_SIZE + 1)
+        )
+        FinishedProduct.objects.create(name="Atta")
+
+    def test_tables_are_paged_independently(self):
+        response = self.client.get('/report-panel/', {'report_type': 'inventory_summary', 'raw_page': 2})
+        inventory = response.context['report_data']['inventory']
+        self.assertEqual(inventory['raw_materials'].number, 2)
+        self.assertEqual(list(inventory['raw_materials']), [RawMaterial.objects.get(name=f"Material {INVENTORY_PAGE_SIZE:03}")])
+        self.assertEqual(inventory['finished_products'].number, 1)
+        self.assertContains(response, "Atta")
+
+    def test_next_link_keeps_the_report_parameters(self):
+        response = self.client.get('/report-panel/', {'report_type': 'inventory_summary'})
+        self.assertContains(response, 'href="?report_type=inventory_summary&amp;raw_page=2"')
@@ -1,22 +1,51 @@
 # management/views.py
 
+from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404
 from django.db.models.functions import TruncMonth, TruncWeek, TruncDay
-from django.db.models import Sum, F
+from django.db.models import Sum, F, Case, When, Value, OuterRef, Subquery, DecimalField, ExpressionWrapper, Prefetch
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time, timedelta
+from decimal import Decimal
 from .models import Bill, BillItem, WheatPurchase, Expense, Production
 
+# Rows per page for each table in the inventory summary
+INVENTORY_PAGE_SIZE = 50
+
+def _bill_grand_total_expression():
+    """
+    Builds the SQL equivalent of Bill.get_grand_total() so sales can be
+    summed by the database in a single query.
+    """
+    subtotal = Subquery(
+        BillItem.objects.filter(bill=OuterRef('pk')).values('bill').annotate(
+            total=Sum('total_price')
+        ).values('total')
+    )
+    gst_multiplier = Case(
+        When(has_gst=True, then=Value(Decimal('1.18'))),
+        default=Value(Decimal('1.00')),
+    )
+    return ExpressionWrapper(
+        Coalesce(subtotal, Value(Decimal('0.00'))) * gst_multiplier + F('other_expenses'),
+        output_field=DecimalField(),
+    )
+
 def bill_print_view(request, bill_id):
     """
     Renders a printable bill template for a specific bill ID.
     It retrieves bill and bill items data from the database.
     """
-    bill = get_object_or_404(Bill, id=bill_id)
-    bill_items = BillItem.objects.filter(bill=bill).annotate(
-        total_price=F('quantity_kg') * F('price_per_unit')
+    bill = get_object_or_404(
+        Bill.objects.select_related('customer').prefetch_related(
+            Prefetch('items', queryset=BillItem.objects.select_related('product'))
+        ),
+        id=bill_id,
     )
-    
+    # Already prefetched, so totals below are computed without further queries
+    bill_items = bill.items.all()
+
     context = {
         'bill': bill,
         'bill_items': bill_items,
@@ -51,10 +80,16 @@ def report_panel_view(request):
         end_date = today
 
     report_data = {}
-    
-    bills = Bill.objects.filter(bill_date__date__range=[start_date, end_date])
-    expenses = Expense.objects.filter(date__date__range=[start_date, end_date])
-    productions = Production.objects.filter(production_date__date__range=[start_date, end_date])
+
+    # Half-open datetime range so the date column indexes can be used directly
+    start_dt = timezone.make_aware(datetime.combine(start_date, time.min))
+    end_dt = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+
+    # These stay lazy; every report below reduces them with values()/annotate()
+    # or aggregate(), so only grouping keys and totals are ever selected.
+    bills = Bill.objects.filter(bill_date__gte=start_dt, bill_date__lt=end_dt)
+    expenses = Expense.objects.filter(date__gte=start_dt, date__lt=end_dt)
+    productions = Production.objects.filter(production_date__gte=start_dt, production_date__lt=end_dt)
 
     if report_type in ['daily_sales', 'weekly_sales', 'monthly_sales']:
         date_grouping = None
@@ -66,15 +101,15 @@ def report_panel_view(request):
             date_grouping = TruncMonth('bill_date')
         
         sales_data = bills.annotate(date=date_grouping).values('date').annotate(
-            total_sales=Sum(F('get_grand_total'))
+            total_sales=Sum(_bill_grand_total_expression())
         ).order_by('date')
-        report_data['sales'] = sales_data
+        report_data['sales'] = list(sales_data)
         
     elif report_type == 'sales_profit':
-        total_sales = bills.aggregate(total_sales=Sum(F('get_grand_total')))['total_sales'] or 0
+        total_sales = bills.aggregate(total_sales=Sum(_bill_grand_total_expression()))['total_sales'] or 0
         total_expenses = expenses.aggregate(total_expenses=Sum('amount'))['total_expenses'] or 0
         total_wheat_purchase = WheatPurchase.objects.filter(
-            purchase_date__date__range=[start_date, end_date]
+            purchase_date__gte=start_dt, purchase_date__lt=end_dt
         ).aggregate(total_purchase=Sum(F('quantity_kg') * F('price_per_unit')))['total_purchase'] or 0
         
         report_data['profit_loss'] = {
@@ -84,24 +119,27 @@ def report_panel_view(request):
         }
 
     elif report_type == 'production_summary':
-        production_data = productions.values('product__name').annotate(
+        production_data = productions.values('finished_product__name').annotate(
             total_quantity=Sum(F('quantity_kg'))
-        ).order_by('product__name')
-        report_data['production'] = production_data
+        ).order_by('finished_product__name')
+        report_data['production'] = list(production_data)
         
     elif report_type == 'expense_summary':
         expense_data = expenses.values('description').annotate(
             total_amount=Sum('amount')
         ).order_by('description')
-        report_data['expenses'] = expense_data
+        report_data['expenses'] = list(expense_data)
 
     elif report_type == 'inventory_summary':
         from .models import RawMaterial, FinishedProduct
-        raw_materials = RawMaterial.objects.all()
-        finished_products = FinishedProduct.objects.all()
+        raw_materials = RawMaterial.objects.only('name', 'current_stock_kg').order_by('name')
+        finished_products = FinishedProduct.objects.only(
+            'name', 'current_stock_kg', 'cost_per_kg', 'mrp_per_kg', 'selling_price_per_kg'
+        ).order_by('name')
+        # Each table is paged on its own query parameter
         report_data['inventory'] = {
-            'raw_materials': raw_materials,
-            'finished_products': finished_products
+            'raw_materials': Paginator(raw_materials, INVENTORY_PAGE_SIZE).get_page(request.GET.get('raw_page')),
+            'finished_products': Paginator(finished_products, INVENTORY_PAGE_SIZE).get_page(request.GET.get('product_page')),
         }
         
     context = {